@@ -15,6 +15,7 @@ requests per minute for the account type that you have.
 from __future__ import annotations
 
 import traceback
+import weakref
 from abc import abstractmethod
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, ClassVar
@@ -127,6 +128,15 @@ class HttpProvider(Provider):
     # List of required __init__ params
     _REQUIRED_PARAMS: ClassVar[list[str]] = []
 
+    # Connection pool limits - idle connections are kept alive so that
+    # successive (and concurrent) lookups to the service reuse them
+    # rather than paying for a new TCP/TLS handshake on each request.
+    _HTTP_LIMITS: ClassVar[httpx.Limits] = httpx.Limits(
+        max_connections=64,
+        max_keepalive_connections=32,
+        keepalive_expiry=60,
+    )
+
     def __init__(
         self: HttpProvider,
         *,
@@ -137,7 +147,11 @@ class HttpProvider(Provider):
     ) -> None:
         """Initialize the class."""
         super().__init__()
-        self._httpx_client = httpx.Client(timeout=get_http_timeout(timeout=timeout))
+        self._httpx_client = httpx.Client(
+            timeout=get_http_timeout(timeout=timeout),
+            limits=self._HTTP_LIMITS,
+        )
+        weakref.finalize(self, self._httpx_client.close)
         self._request_params: dict[str, Any] = {
             "ApiID": None,
             "AuthKey": None,
@@ -204,9 +218,8 @@ class HttpProvider(Provider):
 
         Notes
         -----
-        Note: this method uses memoization (lru_cache) to cache results
-        for a particular item to try avoid repeated network calls for
-        the same item.
+        Note: implementations may cache results for a particular item
+        to try avoid repeated network calls for the same item.
 
         """
 
@@ -832,6 +832,7 @@ class Lookup:
                     title="Provider configuration error",
                     help_uri=self._HELP_URI,
                 ) from mp_ex
+            self._configure_provider(provider_instance, provider_name, settings)
 
             # set the description from settings, if one is provided, otherwise
             # use class docstring.
@@ -845,6 +846,15 @@ class Lookup:
                 primary=settings.primary,
             )
 
+    def _configure_provider(
+        self: Self,
+        provider: Provider,
+        provider_name: str,
+        settings: ProviderSettings,
+    ) -> None:
+        """Apply any additional provider settings after loading the provider."""
+        del provider, provider_name, settings
+
     def _select_providers(
         self: Self,
         providers: list[str] | None = None,
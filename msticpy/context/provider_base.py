@@ -366,6 +366,33 @@ class Provider(ABC):
         """
         return _ITEM_EXTRACT.get_ioc_type(item)
 
+    @staticmethod
+    def resolve_item_types(items: Iterable[str]) -> list[str]:
+        """
+        Return IoCTypes for a collection of items.
+
+        Parameters
+        ----------
+        items : Iterable[str]
+            Item strings
+
+        Returns
+        -------
+        list[str]
+            IoCTypes (or unknown if type could not be determined)
+            in the same order as `items`.
+
+        Notes
+        -----
+        Each distinct item is only resolved once.
+
+        """
+        items = list(items)
+        item_types: dict[str, str] = {
+            item: Provider.resolve_item_type(item) for item in set(items)
+        }
+        return [item_types[item] for item in items]
+
     async def _lookup_items_async_wrapper(  # pylint: disable=too-many-arguments # noqa: PLR0913
         self: Self,
         data: pd.DataFrame | dict[str, str] | Iterable[str],
@@ -477,11 +504,13 @@ def _(
     item_col: str,
     item_type_col: str | None = None,
 ) -> Generator[tuple[Any, Any], Any, None]:
-    for _, row in data.iterrows():
-        if item_type_col is None:
-            yield row[item_col], Provider.resolve_item_type(row[item_col])
-        else:
-            yield row[item_col], row[item_type_col]
+    items: list[Any] = data[item_col].to_list()
+    item_types: list[Any] = (
+        Provider.resolve_item_types(items)
+        if item_type_col is None
+        else data[item_type_col].to_list()
+    )
+    yield from zip(items, item_types)
 
 
 @generate_items.register(dict)
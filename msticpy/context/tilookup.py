@@ -19,21 +19,31 @@ from typing import TYPE_CHECKING, ClassVar, Iterable, Mapping
 from typing_extensions import Self
 
 from .._version import VERSION
+from ..common.exceptions import MsticpyUserConfigError
 from ..common.utility import export
 from .lookup import Lookup
 
 # used in dynamic instantiation of providers
 from .provider_base import Provider, _make_sync
 from .tiproviders import TI_PROVIDERS
+from .tiproviders.ti_provider_base import TIProvider
 
 if TYPE_CHECKING:
     import datetime
 
     import pandas as pd
 
+    from ..common.provider_settings import ProviderSettings
+
 __version__ = VERSION
 __author__ = "Ian Hellen"
 
+# provider settings used to override TI provider lookup limits
+_LOOKUP_LIMIT_SETTINGS: dict[str, str] = {
+    "Concurrency": "concurrency",
+    "RequestsPerMinute": "requests_per_minute",
+}
+
 
 @export
 class TILookup(Lookup):
@@ -304,3 +314,31 @@ class TILookup(Lookup):
     ) -> None:
         """Load provider classes based on config."""
         return super()._load_providers(providers=providers)
+
+    def _configure_provider(
+        self: Self,
+        provider: Provider,
+        provider_name: str,
+        settings: ProviderSettings,
+    ) -> None:
+        """Apply lookup limits from the provider settings."""
+        lookup_limits: dict[str, str] = {
+            arg_name: settings.args[key]
+            for key, arg_name in _LOOKUP_LIMIT_SETTINGS.items()
+            if key in settings.args
+        }
+        if not lookup_limits or not isinstance(provider, TIProvider):
+            return
+        try:
+            provider.set_lookup_limits(**lookup_limits)
+        except ValueError as err:
+            err_msg: str = (
+                f"Invalid lookup limits for Provider {provider_name} {err.args}. "
+                "'Concurrency' must be a positive integer and "
+                "'RequestsPerMinute' must be a non-negative number."
+            )
+            raise MsticpyUserConfigError(
+                err_msg,
+                title="Provider configuration error",
+                help_uri=self._HELP_URI,
+            ) from err
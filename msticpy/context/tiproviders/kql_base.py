@@ -19,7 +19,7 @@ import contextlib
 import logging
 import warnings
 from collections import defaultdict
-from functools import lru_cache
+from functools import partial
 from typing import TYPE_CHECKING, Any, Callable, ClassVar, Iterable
 
 import pandas as pd
@@ -35,9 +35,13 @@ from ..provider_base import generate_items
 from .ti_provider_base import ResultSeverity, TIProvider
 
 if TYPE_CHECKING:
+    import asyncio
     import datetime as dt
 
     from Kqlmagic.results import ResultSet
+
+    from ..lookup import ProgressCounter
+    from .ti_provider_base import _AsyncRateLimiter
 logger: logging.Logger = logging.getLogger(__name__)
 __version__ = VERSION
 __author__ = "Ian Hellen"
@@ -56,6 +60,10 @@ class KqlTIProvider(TIProvider):
     )
 
     _REQUIRED_TABLES: ClassVar[list[str]] = []
+    # Queries share a single query provider whose driver (e.g. Kqlmagic)
+    # is not thread-safe, so bulk lookups are not run in parallel.
+    _CONCURRENCY: ClassVar[int] = 1
+    _SUPPORTS_BULK_LOOKUP: ClassVar[bool] = True
 
     def __init__(
         self: KqlTIProvider,
@@ -85,7 +93,6 @@ class KqlTIProvider(TIProvider):
     def _connected(self: Self) -> bool:
         return self._query_provider.connected
 
-    @lru_cache(maxsize=256)
     def lookup_ioc(
         self: Self,
         ioc: str,
@@ -119,9 +126,9 @@ class KqlTIProvider(TIProvider):
 
         Notes
         -----
-        Note: this method uses memoization (lru_cache) to cache results
-        for a particular item to try avoid repeated network calls for
-        the same item.
+        Note: results are cached by `lookup_item` to try avoid
+        repeated network calls for the same item. Calling this
+        method directly always queries the provider.
 
         """
         return self.lookup_iocs(
@@ -246,6 +253,31 @@ class KqlTIProvider(TIProvider):
         logger.info("No results found in data for any iocs.")
         return pd.DataFrame()
 
+    async def _lookup_iocs_bulk(  # noqa: PLR0913
+        self: Self,
+        ioc_type: str | None,
+        iocs: list[str],
+        query_type: str | None = None,
+        *,
+        semaphore: asyncio.Semaphore,
+        rate_limiter: _AsyncRateLimiter | None = None,
+        prog_counter: ProgressCounter | None = None,
+    ) -> pd.DataFrame:
+        """Lookup a batch of IoCs of the same type with a single query."""
+        try:
+            return await self._run_limited(
+                partial(
+                    self.lookup_iocs,
+                    data=dict.fromkeys(iocs, ioc_type),
+                    query_type=query_type,
+                ),
+                semaphore=semaphore,
+                rate_limiter=rate_limiter,
+            )
+        finally:
+            if prog_counter:
+                await prog_counter.decrement(len(iocs))
+
     @staticmethod
     def _add_failure_status(
         src_ioc_frame: pd.DataFrame,
@@ -52,6 +52,7 @@ class OPR(HttpTIProvider):
     }
 
     _REQUIRED_PARAMS: ClassVar[list[str]] = ["AuthKey"]
+    _SUPPORTS_BULK_LOOKUP: ClassVar[bool] = True
 
     def __init__(
         self: OPR,
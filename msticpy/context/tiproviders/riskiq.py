@@ -111,6 +111,10 @@ class RiskIQ(TIProvider, TIPivotProvider):
     _QUERIES["dns-trackers"] = _QUERIES["hostname-trackers"]
     _QUERIES["dns-whois"] = _QUERIES["hostname-whois"]
 
+    # Lookups set the context of the module-global passivetotal analyzer
+    # before querying, so lookups are not run in parallel.
+    _CONCURRENCY: ClassVar[int] = 1
+
     _PIVOT_ENTITIES: ClassVar[dict[str, dict[str, str]]] = {
         "services": {"IpAddress": "Address"},
         **{
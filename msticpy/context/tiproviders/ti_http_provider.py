@@ -14,10 +14,13 @@ requests per minute for the account type that you have.
 """
 from __future__ import annotations
 
-from functools import lru_cache
+import logging
+import time
+from email.utils import parsedate_to_datetime
 from json import JSONDecodeError
-from typing import TYPE_CHECKING, Any
+from typing import Any, ClassVar
 
+import httpx
 import pandas as pd
 from typing_extensions import Self
 
@@ -29,16 +32,21 @@ from ..lookup_result import LookupStatus
 from .result_severity import ResultSeverity
 from .ti_provider_base import TIProvider
 
-if TYPE_CHECKING:
-    import httpx
 __version__ = VERSION
 __author__ = "Ian Hellen"
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 
 @export
 class HttpTIProvider(TIProvider, HttpProvider):
     """HTTP API Lookup provider base class."""
 
+    # Number of times to retry a request rejected by the provider's
+    # rate limit (HTTP 429) and the maximum delay in seconds between retries
+    _MAX_RETRIES: ClassVar[int] = 3
+    _MAX_RETRY_DELAY: ClassVar[float] = 60
+
     def __init__(
         self: HttpTIProvider,
         *,
@@ -100,9 +108,9 @@ class HttpTIProvider(TIProvider, HttpProvider):
 
         Notes
         -----
-        Note: this method uses memoization (lru_cache) to cache results
-        for a particular item to try avoid repeated network calls for
-        the same item.
+        Requests rejected by the provider's rate limit (HTTP 429) are
+        retried up to `_MAX_RETRIES` times, waiting for the period given
+        in the response's Retry-After header.
 
         """
         verb, req_params = self._substitute_parms(
@@ -110,19 +118,7 @@ class HttpTIProvider(TIProvider, HttpProvider):
             result["IocType"],
             query_type,
         )
-        if verb == "GET":
-            response: httpx.Response = self._httpx_client.get(
-                **req_params,
-                timeout=get_http_timeout(timeout=timeout),
-            )
-        elif verb == "POST":
-            response = self._httpx_client.post(
-                **req_params,
-                timeout=get_http_timeout(timeout=timeout),
-            )
-        else:
-            err_msg: str = f"Unsupported verb {verb}"
-            raise NotImplementedError(err_msg)
+        response: httpx.Response = self._send_query(verb, req_params, timeout=timeout)
 
         result["Status"] = response.status_code
         result["Reference"] = req_params["url"]
@@ -150,7 +146,42 @@ class HttpTIProvider(TIProvider, HttpProvider):
             result["Details"] = self._response_message(result["Status"])
         return result
 
-    @lru_cache(maxsize=256)
+    def _send_query(
+        self: Self,
+        verb: str,
+        req_params: dict[str, Any],
+        *,
+        timeout: int | None = None,
+    ) -> httpx.Response:
+        """Send the query, retrying requests that are rate-limited."""
+        if verb not in ("GET", "POST"):
+            err_msg: str = f"Unsupported verb {verb}"
+            raise NotImplementedError(err_msg)
+        send_request = (
+            self._httpx_client.get if verb == "GET" else self._httpx_client.post
+        )
+        for attempt in range(self._MAX_RETRIES + 1):
+            response: httpx.Response = send_request(
+                **req_params,
+                timeout=get_http_timeout(timeout=timeout),
+            )
+            if (
+                response.status_code != httpx.codes.TOO_MANY_REQUESTS
+                or attempt == self._MAX_RETRIES
+            ):
+                break
+            delay: float = min(
+                _retry_after(response, default=2**attempt),
+                self._MAX_RETRY_DELAY,
+            )
+            logger.info(
+                "%s rate limit exceeded, retrying in %.1f seconds",
+                self.__class__.__name__,
+                delay,
+            )
+            time.sleep(delay)
+        return response
+
     def lookup_ioc(  # noqa: PLR0913
         self: Self,
         ioc: str,
@@ -195,9 +226,9 @@ class HttpTIProvider(TIProvider, HttpProvider):
 
         Notes
         -----
-        Note: this method uses memoization (lru_cache) to cache results
-        for a particular item to try avoid repeated network calls for
-        the same item.
+        Note: results are cached by `lookup_item` to try avoid
+        repeated network calls for the same item. Calling this
+        method directly always queries the provider.
 
         """
         result: dict[str, Any] = self._check_ioc_type(
@@ -225,3 +256,19 @@ class HttpTIProvider(TIProvider, HttpProvider):
                 url: str | None = req_params.get("url") if req_params else None
                 result["Reference"] = url
         return pd.DataFrame([result])
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    """Return the delay in seconds requested by a Retry-After header."""
+    retry_after: str | None = response.headers.get("Retry-After")
+    if not retry_after:
+        return default
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+    try:
+        retry_time = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return default
+    return max(retry_time.timestamp() - time.time(), 0)
@@ -14,22 +14,40 @@ requests per minute for the account type that you have.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+import time
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Any, ClassVar, Iterable
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Iterable as C_Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache, partial
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Coroutine,
+    Generator,
+    Iterable,
+    NamedTuple,
+)
 
+import pandas as pd
 from typing_extensions import Self
 
 from ..._version import VERSION
 from ...common.utility import export
-from ..provider_base import PivotProvider, Provider
+from ..lookup_result import LookupStatus
+from ..provider_base import PivotProvider, Provider, _make_sync, generate_items
 from .result_severity import ResultSeverity
 
 if TYPE_CHECKING:
-    import pandas as pd
-
     from ...init.pivot import Pivot
     from ...init.pivot_core.pivot_register import PivotRegistration
+    from ..lookup import ProgressCounter
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -37,12 +55,102 @@ __version__ = VERSION
 __author__ = "Ian Hellen"
 
 
+class LookupCacheInfo(NamedTuple):
+    """Statistics for the provider lookup cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 @export
 class TIProvider(Provider):
     """Abstract base class for Threat Intel providers."""
 
     _QUERIES: ClassVar[dict[str, Any]] = {}
 
+    # Maximum number of concurrent lookups made by the async wrapper
+    _CONCURRENCY: ClassVar[int] = 10
+    # Maximum number of lookups per minute (None for no limit)
+    _REQUESTS_PER_MINUTE: ClassVar[float | None] = None
+    # Per-instance overrides of these limits (see `set_lookup_limits`)
+    _concurrency: int | None = None
+    _requests_per_minute: float | None = None
+    # Limiters shared by all lookups made by the provider instance
+    _semaphore: asyncio.Semaphore | None = None
+    _semaphore_loop: asyncio.AbstractEventLoop | None = None
+    _rate_limiter: _AsyncRateLimiter | None = None
+    # Maximum number of lookup results held in the lookup cache
+    _CACHE_SIZE: ClassVar[int] = 1024
+    # Set to True if `lookup_iocs` queries multiple observables at once
+    _SUPPORTS_BULK_LOOKUP: ClassVar[bool] = False
+
+    def set_lookup_limits(
+        self: Self,
+        *,
+        concurrency: int | str | None = None,
+        requests_per_minute: float | str | None = None,
+    ) -> None:
+        """
+        Override the lookup concurrency and rate limits for this provider.
+
+        Parameters
+        ----------
+        concurrency : int, optional
+            Maximum number of concurrent lookups, by default None
+            (use the provider default)
+        requests_per_minute : float, optional
+            Maximum number of lookups per minute, by default None
+            (use the provider default). Use 0 to remove the limit.
+
+        Raises
+        ------
+        ValueError
+            If `concurrency` is less than 1 or `requests_per_minute`
+            is negative.
+
+        """
+        if concurrency is not None:
+            if int(concurrency) < 1:
+                raise ValueError("concurrency must be a positive integer.")
+            self._concurrency = int(concurrency)
+        if requests_per_minute is not None:
+            if float(requests_per_minute) < 0:
+                raise ValueError("requests_per_minute must not be negative.")
+            self._requests_per_minute = float(requests_per_minute)
+        with _LIMITERS_LOCK:
+            self._semaphore = self._semaphore_loop = self._rate_limiter = None
+
+    def _lookup_limits(self: Self) -> tuple[int, float | None]:
+        """Return the concurrency and per minute rate limits for lookups."""
+        requests_per_minute: float | None = (
+            self._REQUESTS_PER_MINUTE
+            if self._requests_per_minute is None
+            else self._requests_per_minute
+        )
+        return self._concurrency or self._CONCURRENCY, requests_per_minute or None
+
+    def _get_limiters(self: Self) -> tuple[asyncio.Semaphore, _AsyncRateLimiter | None]:
+        """
+        Return the concurrency semaphore and rate limiter for lookups.
+
+        The limiters are shared by all lookups made by this provider
+        instance, so that the limits apply across calls. The semaphore
+        is bound to the running event loop and is re-created if this is
+        called from a different event loop.
+
+        """
+        concurrency, requests_per_minute = self._lookup_limits()
+        event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        with _LIMITERS_LOCK:
+            if self._semaphore is None or self._semaphore_loop is not event_loop:
+                self._semaphore = asyncio.Semaphore(concurrency)
+                self._semaphore_loop = event_loop
+            if requests_per_minute and self._rate_limiter is None:
+                self._rate_limiter = _AsyncRateLimiter(requests_per_minute)
+            return self._semaphore, self._rate_limiter
+
     def _check_item_type(
         self: Self,
         item: str,
@@ -149,17 +257,183 @@ class TIProvider(Provider):
 
         Notes
         -----
-        Note: this method uses memoization (lru_cache) to cache results
+        Note: this method uses an LRU cache to cache successful results
         for a particular observable to try avoid repeated network calls for
-        the same item.
+        the same item. Use `cache_info` to view cache statistics.
+
+        """
+        return self._cached_lookup_ioc(item, item_type, query_type)
+
+    def lookup_items(
+        self: Self,
+        data: pd.DataFrame | dict[str, str] | Iterable[str],
+        item_col: str | None = None,
+        item_type_col: str | None = None,
+        query_type: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Lookup collection of items.
+
+        Parameters
+        ----------
+        data : Union[pd.DataFrame, dict[str, str], Iterable[str]]
+            Data input in one of three formats:
+            1. Pandas dataframe (you must supply the column name in
+            `item_col` parameter)
+            2. Dict of items
+            3. Iterable of items
+        item_col : str, optional
+            DataFrame column to use for items, by default None
+        item_type_col : str, optional
+            DataFrame column to use for types, by default None
+        query_type : str, optional
+            Specify the data subtype to be queried, by default None.
+            If not specified the default record type for the type
+            will be returned.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame of results.
+
+        Notes
+        -----
+        Items are looked up with the async IoC lookup engine
+        (see `lookup_iocs_async`), so that the provider concurrency
+        and rate limits are applied.
+
+        """
+        return _run_sync(
+            self._lookup_iocs_async_wrapper(
+                data,
+                ioc_col=item_col,
+                ioc_type_col=item_type_col,
+                query_type=query_type,
+            )
+        )
+
+    async def lookup_items_async(  # noqa:PLR0913
+        self: Self,
+        data: pd.DataFrame | dict[str, str] | Iterable[str],
+        item_col: str | None = None,
+        item_type_col: str | None = None,
+        query_type: str | None = None,
+        *,
+        prog_counter: ProgressCounter | None = None,
+        item_type: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Lookup collection of items.
+
+        Parameters
+        ----------
+        data : Union[pd.DataFrame, dict[str, str], Iterable[str]]
+            Data input in one of three formats:
+            1. Pandas dataframe (you must supply the column name in
+            `item_col` parameter)
+            2. Dict of items, Type
+            3. Iterable of items - Types will be inferred
+        item_col : str, optional
+            DataFrame column to use for items, by default None
+        item_type_col : str, optional
+            DataFrame column to use for Types, by default None
+        query_type : str, optional
+            Specify the data subtype to be queried, by default None.
+            If not specified the default record type for the item
+            will be returned.
+        prog_counter: ProgressCounter, Optional
+            Progress Counter to display progess of IOC searches.
+        item_type: str, Optional
+            Type of item
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame of results.
+
+        Notes
+        -----
+        Items are looked up with the async IoC lookup engine
+        (see `lookup_iocs_async`), so that the provider concurrency
+        and rate limits are applied.
 
         """
-        return self.lookup_ioc(
-            ioc=item,
-            ioc_type=item_type,
+        if item_type:
+            items: list[str] = [
+                item
+                for item, _ in generate_items(data, item_col, item_type_col)
+                if item
+            ]
+            data = pd.DataFrame({"Ioc": items, "IocType": item_type})
+            item_col, item_type_col = "Ioc", "IocType"
+        return await self._lookup_iocs_async_wrapper(
+            data,
+            ioc_col=item_col,
+            ioc_type_col=item_type_col,
             query_type=query_type,
+            prog_counter=prog_counter,
         )
 
+    @cached_property
+    def _lookup_cache(self: Self) -> _LookupCache:
+        """Return the lookup cache for this provider instance."""
+        return _LookupCache(maxsize=self._CACHE_SIZE)
+
+    def _cached_lookup_ioc(
+        self: Self,
+        ioc: str,
+        ioc_type: str | None = None,
+        query_type: str | None = None,
+    ) -> pd.DataFrame:
+        """Return `lookup_ioc` result from the cache, or lookup and cache it."""
+        cache_key: tuple = self._cache_key(ioc, ioc_type, query_type)
+        result: pd.DataFrame | None = self._lookup_cache.get(cache_key)
+        if result is None:
+            result = self.lookup_ioc(ioc=ioc, ioc_type=ioc_type, query_type=query_type)
+            self._cache_result(cache_key, result)
+        return result
+
+    def _cache_result(self: Self, cache_key: tuple, result: pd.DataFrame) -> None:
+        """
+        Add a lookup result to the cache if the lookup succeeded.
+
+        Failed lookups (e.g. rate-limited or server errors) are not
+        cached so that they are retried by subsequent lookups.
+
+        """
+        if (
+            "Status" in result.columns
+            and not result.empty
+            and (result["Status"] == LookupStatus.OK.value).all()
+        ):
+            self._lookup_cache.put(cache_key, result)
+
+    def _cache_key(
+        self: Self,
+        ioc: str,
+        ioc_type: str | None,
+        query_type: str | None,
+    ) -> tuple:
+        """Return the lookup cache key for an IoC (resolving its type if None)."""
+        ioc_type = ioc_type or self.resolve_ioc_type(ioc)
+        return (self.__class__.__name__, ioc, ioc_type, query_type)
+
+    def cache_info(self: Self) -> LookupCacheInfo:
+        """
+        Return statistics for the lookup cache.
+
+        Returns
+        -------
+        LookupCacheInfo
+            Cache hits, misses, maximum size and current size.
+
+        """
+        return self._lookup_cache.info()
+
+    def cache_clear(self: Self) -> None:
+        """Clear the lookup cache."""
+        self._lookup_cache.clear()
+
     @abstractmethod
     def parse_results(self: Self, response: dict) -> tuple[bool, ResultSeverity, Any]:
         """
@@ -239,12 +513,131 @@ class TIProvider(Provider):
         pd.DataFrame
             DataFrame of results.
 
+        Notes
+        -----
+        Lookups are run concurrently using the async lookup engine
+        (see `lookup_iocs_async`). Failed lookups are returned as
+        result rows with a failure status rather than raising.
+
+        See Also
+        --------
+        iter_lookup_iocs : Lookup IoCs, returning results in chunks.
+
         """
-        return self.lookup_items(
-            data,
-            item_col=ioc_col,
-            item_type_col=ioc_type_col,
-            query_type=query_type,
+        results: list[pd.DataFrame] = list(
+            self.iter_lookup_iocs(
+                data,
+                ioc_col=ioc_col,
+                ioc_type_col=ioc_type_col,
+                query_type=query_type,
+            )
+        )
+        if not results:
+            return pd.DataFrame()
+        return pd.concat(results, ignore_index=True)
+
+    def iter_lookup_iocs(  # noqa: PLR0913
+        self: Self,
+        data: pd.DataFrame | dict[str, str] | Iterable[str],
+        ioc_col: str | None = None,
+        ioc_type_col: str | None = None,
+        query_type: str | None = None,
+        *,
+        chunk_size: int = 10000,
+    ) -> Generator[pd.DataFrame, None, None]:
+        """
+        Lookup collection of IoC observables, yielding results in chunks.
+
+        Parameters
+        ----------
+        data : Union[pd.DataFrame, dict[str, str], Iterable[str]]
+            Data input in one of three formats:
+            1. Pandas dataframe (you must supply the column name in
+            `ioc_col` parameter)
+            2. Dict of observable, IoCType
+            3. Iterable of observables - IoCTypes will be inferred
+        ioc_col : str, optional
+            DataFrame column to use for observables, by default None
+        ioc_type_col : str, optional
+            DataFrame column to use for IoCTypes, by default None
+        query_type : str, optional
+            Specify the data subtype to be queried, by default None.
+            If not specified the default record type for the IoC type
+            will be returned.
+        chunk_size : int, optional
+            The maximum number of observables to lookup in each chunk,
+            by default 10000
+
+        Yields
+        ------
+        pd.DataFrame
+            DataFrame of results for each chunk of observables.
+
+        Notes
+        -----
+        Only the results for the current chunk are held by this method,
+        so callers can process or write out each chunk (rather than
+        combining them) to limit memory use for very large inputs.
+
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        chunks: Iterable[list[tuple[str, str | None]]]
+        if isinstance(data, (pd.DataFrame, dict)) or not isinstance(data, C_Iterable):
+            chunks = _chunked(
+                (
+                    (ioc, ioc_type)
+                    for ioc, ioc_type in generate_items(data, ioc_col, ioc_type_col)
+                    if ioc
+                ),
+                chunk_size,
+            )
+        else:
+            # resolve the types of each chunk of observables in one batch
+            chunks = (
+                list(zip(ioc_chunk, self.resolve_ioc_types(ioc_chunk)))
+                for ioc_chunk in _chunked((ioc for ioc in data if ioc), chunk_size)
+            )
+        for chunk in chunks:
+            iocs, ioc_types = zip(*chunk)
+            yield self._lookup_iocs_chunk(
+                pd.DataFrame({"Ioc": iocs, "IocType": ioc_types}),
+                ioc_col="Ioc",
+                ioc_type_col="IocType",
+                query_type=query_type,
+            )
+
+    def _lookup_iocs_chunk(
+        self: Self,
+        data: pd.DataFrame,
+        ioc_col: str,
+        ioc_type_col: str,
+        query_type: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Lookup a chunk of IoC observables for `iter_lookup_iocs`.
+
+        The chunk is looked up using `lookup_iocs_async`, so that
+        lookups run concurrently. Providers that set
+        `_SUPPORTS_BULK_LOOKUP` (their `lookup_iocs` queries multiple
+        observables at once) have the chunk passed to their
+        `lookup_iocs` implementation.
+
+        """
+        if self._SUPPORTS_BULK_LOOKUP:
+            return self.lookup_iocs(
+                data,
+                ioc_col=ioc_col,
+                ioc_type_col=ioc_type_col,
+                query_type=query_type,
+            )
+        return _run_sync(
+            self.lookup_iocs_async(
+                data,
+                ioc_col=ioc_col,
+                ioc_type_col=ioc_type_col,
+                query_type=query_type,
+            )
         )
 
     async def lookup_iocs_async(
@@ -255,10 +648,10 @@ class TIProvider(Provider):
         query_type: str | None = None,
     ) -> pd.DataFrame:
         """Call base async wrapper."""
-        return await self._lookup_items_async_wrapper(
+        return await self._lookup_iocs_async_wrapper(
             data,
-            item_col=ioc_col,
-            item_type_col=ioc_type_col,
+            ioc_col=ioc_col,
+            ioc_type_col=ioc_type_col,
             query_type=query_type,
         )
 
@@ -268,6 +661,8 @@ class TIProvider(Provider):
         ioc_col: str | None = None,
         ioc_type_col: str | None = None,
         query_type: str | None = None,
+        *,
+        prog_counter: ProgressCounter | None = None,
     ) -> pd.DataFrame:
         """
         Async wrapper for providers that do not implement lookup_iocs_async.
@@ -288,19 +683,205 @@ class TIProvider(Provider):
             Specify the data subtype to be queried, by default None.
             If not specified the default record type for the IoC type
             will be returned.
+        prog_counter: ProgressCounter, Optional
+            Progress Counter, decremented as each IoC lookup completes.
 
         Returns
         -------
         pd.DataFrame
             DataFrame of results.
 
+        Notes
+        -----
+        IoCs are grouped by type and the distinct IoCs in each group
+        are passed to `_lookup_iocs_bulk`. Lookups are run concurrently,
+        with at most `_CONCURRENCY` requests in flight at a time. If the
+        provider defines `_REQUESTS_PER_MINUTE`, requests are also
+        throttled to this rate. These limits are shared by all lookups
+        made by the provider. Results are returned in the same
+        order as the input IoCs.
+
         """
-        return await self._lookup_items_async_wrapper(
-            data,
-            item_col=ioc_col,
-            item_type_col=ioc_type_col,
-            query_type=query_type,
+        items: list[tuple[str, str | None]] = [
+            (ioc, ioc_type)
+            for ioc, ioc_type in generate_items(data, ioc_col, ioc_type_col)
+            if ioc
+        ]
+        if not items:
+            return pd.DataFrame()
+
+        # count of each distinct IoC, so repeated IoCs are only looked up once
+        items_by_type: defaultdict[str | None, dict[str, int]] = defaultdict(dict)
+        for ioc, ioc_type in items:
+            ioc_counts: dict[str, int] = items_by_type[ioc_type]
+            ioc_counts[ioc] = ioc_counts.get(ioc, 0) + 1
+        # repeated IoCs do not need a separate lookup
+        repeat_count: int = len(items) - sum(map(len, items_by_type.values()))
+        if prog_counter and repeat_count:
+            await prog_counter.decrement(repeat_count)
+
+        semaphore, rate_limiter = self._get_limiters()
+        results: list[pd.DataFrame | BaseException] = await asyncio.gather(
+            *(
+                self._lookup_iocs_bulk(
+                    ioc_type,
+                    list(ioc_counts),
+                    query_type,
+                    semaphore=semaphore,
+                    rate_limiter=rate_limiter,
+                    prog_counter=prog_counter,
+                )
+                for ioc_type, ioc_counts in items_by_type.items()
+            ),
+            return_exceptions=True,
+        )
+        results_df: pd.DataFrame = pd.concat(
+            [
+                _repeat_results(
+                    (
+                        pd.concat(
+                            self._lookup_error_result(ioc, ioc_type, query_type, result)
+                            for ioc in ioc_counts
+                        )
+                        if isinstance(result, BaseException)
+                        else result
+                    ),
+                    ioc_counts,
+                )
+                for (ioc_type, ioc_counts), result in zip(
+                    items_by_type.items(), results
+                )
+            ],
+        )
+        return _sort_by_input_order(results_df, [ioc for ioc, _ in items])
+
+    async def _lookup_iocs_bulk(  # noqa: PLR0913
+        self: Self,
+        ioc_type: str | None,
+        iocs: list[str],
+        query_type: str | None = None,
+        *,
+        semaphore: asyncio.Semaphore,
+        rate_limiter: _AsyncRateLimiter | None = None,
+        prog_counter: ProgressCounter | None = None,
+    ) -> pd.DataFrame:
+        """
+        Lookup a batch of IoCs of the same type.
+
+        Parameters
+        ----------
+        ioc_type : str | None
+            The IoC type of all of the IoCs in the batch.
+        iocs : list[str]
+            The IoC observable values.
+        query_type : str, optional
+            Specify the data subtype to be queried, by default None.
+        semaphore : asyncio.Semaphore
+            Semaphore limiting the number of concurrent requests.
+        rate_limiter : _AsyncRateLimiter, optional
+            Rate limiter for requests, by default None.
+        prog_counter: ProgressCounter, Optional
+            Progress Counter, decremented as each IoC lookup completes.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame of results.
+
+        Notes
+        -----
+        The default implementation looks up each IoC concurrently
+        using `lookup_ioc`. Providers that support querying multiple
+        observables in a single request can override this to issue
+        one request per batch (using `_run_limited` to respect the
+        concurrency and rate limits).
+
+        """
+        results: list[pd.DataFrame | BaseException] = await asyncio.gather(
+            *(
+                self._lookup_ioc_limited(
+                    ioc,
+                    ioc_type,
+                    query_type,
+                    semaphore=semaphore,
+                    rate_limiter=rate_limiter,
+                    prog_counter=prog_counter,
+                )
+                for ioc in iocs
+            ),
+            return_exceptions=True,
         )
+        return pd.concat(
+            [
+                (
+                    self._lookup_error_result(ioc, ioc_type, query_type, result)
+                    if isinstance(result, BaseException)
+                    else result
+                )
+                for ioc, result in zip(iocs, results)
+            ],
+        )
+
+    async def _lookup_ioc_limited(  # noqa: PLR0913
+        self: Self,
+        ioc: str,
+        ioc_type: str | None,
+        query_type: str | None,
+        *,
+        semaphore: asyncio.Semaphore,
+        rate_limiter: _AsyncRateLimiter | None = None,
+        prog_counter: ProgressCounter | None = None,
+    ) -> pd.DataFrame:
+        """Run `lookup_ioc` in an executor, bounded by concurrency and rate limits."""
+        try:
+            cache_key: tuple = self._cache_key(ioc, ioc_type, query_type)
+            result: pd.DataFrame | None = self._lookup_cache.get(cache_key)
+            if result is not None:
+                return result
+            result = await self._run_limited(
+                partial(
+                    self.lookup_ioc,
+                    ioc=ioc,
+                    ioc_type=ioc_type,
+                    query_type=query_type,
+                ),
+                semaphore=semaphore,
+                rate_limiter=rate_limiter,
+            )
+            self._cache_result(cache_key, result)
+            return result
+        finally:
+            if prog_counter:
+                await prog_counter.decrement()
+
+    @staticmethod
+    async def _run_limited(
+        lookup_func: Callable[[], pd.DataFrame],
+        *,
+        semaphore: asyncio.Semaphore,
+        rate_limiter: _AsyncRateLimiter | None = None,
+    ) -> pd.DataFrame:
+        """Run a blocking lookup in an executor, bounded by concurrency and rate limits."""
+        async with semaphore:
+            if rate_limiter:
+                await rate_limiter.acquire()
+            event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            return await event_loop.run_in_executor(None, lookup_func)
+
+    def _lookup_error_result(
+        self: Self,
+        ioc: str,
+        ioc_type: str | None,
+        query_type: str | None,
+        err: BaseException,
+    ) -> pd.DataFrame:
+        """Return a failed lookup result for an IoC that raised an exception."""
+        logger.warning("Lookup of %s failed: %s", ioc, err)
+        result: dict[str, Any] = self._check_ioc_type(ioc, ioc_type, query_type)
+        result["Provider"] = self.__class__.__name__
+        result["Status"] = LookupStatus.QUERY_FAILED.value
+        result["Details"] = f"{type(err).__name__}: {err}"
+        return pd.DataFrame([result])
 
     @property
     def ioc_query_defs(self: Self) -> dict[str, Any]:
@@ -319,13 +900,20 @@ class TIProvider(Provider):
     def usage(cls: type[Self]) -> None:
         """Print usage of provider."""
         print(f"{cls.__doc__} Supported query types:")
-        for ioc_key in sorted(cls._QUERIES):
-            ioc_key_elems: list[str] = ioc_key.split("-", maxsplit=1)
-            try:
+        for ioc_key_elems in cls._sorted_query_keys():
+            if len(ioc_key_elems) > 1:
                 print(f"\tioc_type={ioc_key_elems[0]}, query_type={ioc_key_elems[1]}")
-            except IndexError:
+            else:
                 print(f"\tioc_type={ioc_key_elems[0]}")
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _sorted_query_keys(cls: type[Self]) -> tuple[tuple[str, ...], ...]:
+        """Return the sorted query keys split into IoC type and query type."""
+        return tuple(
+            tuple(ioc_key.split("-", maxsplit=1)) for ioc_key in sorted(cls._QUERIES)
+        )
+
     @staticmethod
     def resolve_ioc_type(observable: str) -> str:
         """
@@ -344,6 +932,183 @@ class TIProvider(Provider):
         """
         return TIProvider.resolve_item_type(observable)
 
+    @staticmethod
+    def resolve_ioc_types(observables: Iterable[str]) -> list[str]:
+        """
+        Return IoCTypes for a collection of observables.
+
+        Parameters
+        ----------
+        observables : Iterable[str]
+            IoC observable strings
+
+        Returns
+        -------
+        list[str]
+            IoC Types (or unknown if type could not be determined)
+            in the same order as `observables`.
+
+        """
+        return TIProvider.resolve_item_types(observables)
+
+
+# Guards creation of the providers' shared lookup limiters
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _chunked(items: Iterable[Any], chunk_size: int) -> Generator[list[Any], None, None]:
+    """Yield lists of up to `chunk_size` items from `items`."""
+    items = iter(items)
+    while chunk := list(islice(items, chunk_size)):
+        yield chunk
+
+
+def _sort_by_input_order(results: pd.DataFrame, iocs: list[str]) -> pd.DataFrame:
+    """
+    Return lookup results sorted into the order of the input IoCs.
+
+    Each result row is matched to the position of its "Ioc" value in
+    `iocs` (repeated IoCs are matched in turn). Additional rows for an
+    IoC are kept after its first row and rows that do not match any
+    input IoC are moved to the end.
+
+    """
+    if "Ioc" not in results.columns:
+        return results
+    ioc_positions: defaultdict[str, deque[int]] = defaultdict(deque)
+    for position, ioc in enumerate(iocs):
+        ioc_positions[ioc].append(position)
+    last_position: dict[str, int] = {}
+    row_positions: list[int] = []
+    for ioc in results["Ioc"]:
+        if ioc_positions.get(ioc):
+            last_position[ioc] = ioc_positions[ioc].popleft()
+        row_positions.append(last_position.get(ioc, len(iocs)))
+    return results.iloc[
+        sorted(range(len(row_positions)), key=row_positions.__getitem__)
+    ]
+
+
+def _repeat_results(results: pd.DataFrame, ioc_counts: dict[str, int]) -> pd.DataFrame:
+    """Return lookup results with the rows for each IoC repeated `ioc_counts` times."""
+    if "Ioc" not in results.columns or all(count == 1 for count in ioc_counts.values()):
+        return results
+    ioc_rows: defaultdict[str, list[int]] = defaultdict(list)
+    for position, ioc in enumerate(results["Ioc"]):
+        ioc_rows[ioc].append(position)
+    return results.iloc[
+        [
+            position
+            for ioc, positions in ioc_rows.items()
+            for _ in range(ioc_counts.get(ioc, 1))
+            for position in positions
+        ]
+    ]
+
+
+def _run_sync(coroutine: Coroutine[Any, Any, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Run a lookup coroutine to completion from synchronous code.
+
+    If the calling thread already has a running event loop (e.g. in
+    a notebook) the coroutine is run in its own event loop on a
+    worker thread.
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _make_sync(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class _LookupCache:
+    """Thread-safe LRU cache of lookup results."""
+
+    def __init__(self: _LookupCache, maxsize: int = 1024) -> None:
+        """Initialize the cache."""
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self: Self, key: tuple) -> pd.DataFrame | None:
+        """Return the cached value for `key` or None if not cached."""
+        with self._lock:
+            value: pd.DataFrame | None = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self: Self, key: tuple, value: pd.DataFrame) -> None:
+        """Add `value` to the cache, evicting the least recently used item."""
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self: Self) -> None:
+        """Clear the cache and statistics."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def info(self: Self) -> LookupCacheInfo:
+        """Return cache statistics."""
+        with self._lock:
+            return LookupCacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._cache)
+            )
+
+
+class _AsyncRateLimiter:
+    """
+    Token bucket limiting the rate of async requests.
+
+    The bucket is not bound to an event loop, so can be shared by
+    requests made from different event loops and threads.
+
+    """
+
+    def __init__(self: _AsyncRateLimiter, max_rate: float, time_period: float = 60):
+        """
+        Initialize the rate limiter.
+
+        Parameters
+        ----------
+        max_rate : float
+            Maximum number of requests allowed in `time_period`.
+        time_period : float, optional
+            Time period in seconds, by default 60
+
+        """
+        self._max_rate: float = max_rate
+        self._rate_per_sec: float = max_rate / time_period
+        self._tokens: float = max_rate
+        self._last_check: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self: Self) -> None:
+        """Wait until a request can be made within the rate limit."""
+        with self._lock:
+            now: float = time.monotonic()
+            self._tokens = min(
+                self._max_rate,
+                self._tokens + (now - self._last_check) * self._rate_per_sec,
+            )
+            self._last_check = now
+            # reserve a token, waiting for it to be replenished if necessary
+            self._tokens -= 1
+            delay: float = max(-self._tokens / self._rate_per_sec, 0)
+        if delay:
+            await asyncio.sleep(delay)
+
 
 class TIPivotProvider(PivotProvider):
     """A class which provides TI pivot functions and a means of registering them."""
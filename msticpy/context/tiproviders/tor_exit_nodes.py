@@ -47,6 +47,9 @@ class Tor(TIProvider):
     _nodelist: ClassVar[dict[str, dict[str, str]]] = {}
     _last_cached: datetime = datetime.min
     _cache_lock = Lock()
+    # Lookups are in-memory and the node list download is not
+    # safe to run concurrently, so lookups are not run in parallel.
+    _CONCURRENCY: ClassVar[int] = 1
 
     @classmethod
     def _check_and_get_nodelist(cls: type[Self]) -> None:
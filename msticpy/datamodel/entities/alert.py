@@ -97,7 +97,7 @@ class Alert(Entity):
         if src_entity is not None:
             self._create_from_ent(src_entity)
 
-        if isinstance(src_event, pd.Series) and not src_event.empty:
+        if isinstance(src_event, (pd.Series, Mapping)) and len(src_event) > 0:
             self._create_from_event(src_event)
 
     def _create_from_ent(self, src_entity):  # noqa: MC0001
@@ -185,13 +185,16 @@ class Alert(Entity):
         self.EndTimeUtc = src_event.get("EndTimeUtc", src_event.get("EndTime"))
         self.Severity = src_event.get("Severity", src_event.get("AlertSeverity"))
         self.SystemAlertIds = src_event.get("SystemAlertId", src_event.get("ID"))
-        if isinstance(src_event["Entities"], str):
+        src_entities = src_event.get("Entities")
+        if isinstance(src_entities, str):
             try:
-                ents = _extract_entities(json.loads(src_event["Entities"]))
+                ents = _extract_entities(json.loads(src_entities))
             except json.JSONDecodeError:
                 ents = []
+        elif src_entities is None:
+            ents = []
         else:
-            ents = _extract_entities(src_event["Entities"])
+            ents = _extract_entities(src_entities)
         self.Entities = self._create_entities(ents)
         for ent in self._entity_schema:
             if ent not in self.__dict__:
@@ -68,7 +68,7 @@ class Incident(Entity):
         if src_entity:
             self._create_from_sent_event(src_entity)
 
-        if isinstance(src_event, pd.Series) and src_event_type == "Sentinel":
+        if isinstance(src_event, (pd.Series, Mapping)) and src_event_type == "Sentinel":
             self._create_from_sent_event(src_event)
 
     @property
@@ -5,7 +5,7 @@
 # --------------------------------------------------------------------------
 """Sentinel Alert class."""
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Mapping
 
 import pandas as pd
 
@@ -81,13 +81,7 @@ class SentinelAlert(Alert):
         """
         self._custom_query_params: Dict[str, Any] = {}
         super().__init__(src_entity, src_event, **kwargs)
-        if (
-            isinstance(
-                src_event,
-                pd.Series,
-            )
-            and not src_event.empty
-        ):
+        if isinstance(src_event, (pd.Series, Mapping)) and len(src_event) > 0:
             self._add_sentinel_items(src_event)
             self._add_extended_sent_props()
         self._ids: Dict[str, str] = {}
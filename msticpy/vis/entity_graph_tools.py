@@ -7,16 +7,23 @@
 
 from datetime import datetime, timezone
 from importlib.metadata import version
-from typing import List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Union
 
 import networkx as nx
 import numpy as np
 import pandas as pd
 from bokeh.io import output_notebook, show
+from bokeh.io.state import curstate
 from bokeh.layouts import column
-from bokeh.models import Circle, HoverTool, Label, LayoutDOM  # type: ignore
+from bokeh.models import (  # type: ignore
+    Circle,
+    ColumnDataSource,
+    HoverTool,
+    LabelSet,
+    LayoutDOM,
+)
 from bokeh.plotting import figure, from_networkx
-from dateutil import parser
 from packaging.version import Version, parse
 
 from .._version import VERSION
@@ -39,12 +46,39 @@ __author__ = "Pete Bryan"
 req_alert_cols = ["DisplayName", "Severity", "AlertType"]
 req_inc_cols = ["id", "name", "properties.severity"]
 
+# node colors by (lower-case) entity type
+_TYPE_COLOR_MAP = MappingProxyType(
+    {
+        "incident": "red",
+        "alert": "orange",
+        "alerts": "orange",
+        "securityalert": "orange",
+        "analystnote": "blue",
+    }
+)
+_DEFAULT_COLOR = "green"
+
 _BOKEH_VERSION: Version = parse(version("bokeh"))
+# Bokeh > 3.2 sizes Circle glyphs by radius rather than size
+_BOKEH_GT_3_2: bool = _BOKEH_VERSION > Version("3.2.0")
+_CIRCLE_KEY: str = "radius" if _BOKEH_GT_3_2 else "size"
+_PD_VERSION: Version = parse(pd.__version__)
+
+# pandas 2.x infers a single format from the first value unless told otherwise
+_TO_DATETIME_KWARGS = {"format": "mixed"} if _PD_VERSION >= Version("2.0.0") else {}
 
 # wrap figure function to handle v2/v3 parameter renaming
 figure = bokeh_figure(figure)  # type: ignore[assignment, misc]
 
 
+def _ensure_notebook():
+    """Load BokehJS and enable notebook output if it is not enabled."""
+    # check Bokeh's own state so that notebook output is re-enabled
+    # if it has been reset (e.g. by bokeh.io.reset_output)
+    if not curstate().notebook:
+        output_notebook()
+
+
 @export
 class EntityGraph:
     """Create a graph for visualizing and tracking links between entities."""
@@ -63,8 +97,9 @@ class EntityGraph:
             Can be an Incident, Alert, SecurityAlert or other Entity
 
         """
-        output_notebook()
+        _ensure_notebook()
         self.alertentity_graph = nx.Graph(id="IncidentGraph")
+        self._layout_cache: Dict[Any, Dict[Any, Any]] = {}
         if isinstance(entity, (Incident, Alert)):
             self._add_incident_or_alert_node(entity)
         elif isinstance(entity, pd.DataFrame):
@@ -124,7 +159,44 @@ class EntityGraph:
             A Bokeh figure object
 
         """
-        return plot_entitygraph(self.alertentity_graph, hide=hide, **kwargs)
+        return plot_entitygraph(
+            self.alertentity_graph,
+            hide=hide,
+            node_positions=(
+                kwargs.pop("node_positions", None)
+                or self._get_layout(scale=kwargs.get("scale", 2))
+            ),
+            **kwargs,
+        )
+
+    def _get_layout(self, scale: int = 2) -> Dict[Any, Any]:
+        """
+        Return node positions for the graph, reusing the last layout if unchanged.
+
+        Parameters
+        ----------
+        scale : int, optional
+            Position scale (the default is 2)
+
+        Returns
+        -------
+        Dict[Any, Any]
+            Node positions keyed by node name.
+
+        """
+        layout_key = (
+            scale,
+            frozenset(self.alertentity_graph.nodes),
+            frozenset(frozenset(edge) for edge in self.alertentity_graph.edges),
+        )
+        if layout_key not in self._layout_cache:
+            # only the layout for the current graph state is kept
+            self._layout_cache = {
+                layout_key: nx.spring_layout(
+                    self.alertentity_graph, scale=scale, center=(0, 0)
+                )
+            }
+        return self._layout_cache[layout_key]
 
     def _plot_with_timeline(self, hide: bool = False, **kwargs) -> LayoutDOM:
         """
@@ -146,14 +218,11 @@ class EntityGraph:
 
         tl_type = "duration"
         # pylint: disable=unsubscriptable-object
-        if len(tl_df["EndTime"].unique()) == 1 and not tl_df["EndTime"].unique()[0]:
+        if not tl_df["EndTime"].notna().any():
             tl_type = "discreet"
-            if (
-                len(tl_df["TimeGenerated"].unique()) == 1
-                and not tl_df["TimeGenerated"].unique()[0]
-            ):
+            if not tl_df["TimeGenerated"].notna().any():
                 print("No timestamps available to create timeline")
-                return self._plot_no_timeline(timeline=False, hide=hide, **kwargs)
+                return self._plot_no_timeline(hide=hide, **kwargs)
 
         graph = self._plot_no_timeline(hide=True, **kwargs)
         if tl_type == "duration":
@@ -169,7 +238,7 @@ class EntityGraph:
                 width=800,
             )
         elif tl_type == "discreet":
-            tl_df = tl_df.dropna(subset=["TimeGenerated"])
+            # remove missing time values
             timeline = display_timeline(
                 tl_df.dropna(subset=["TimeGenerated"]),
                 group_by="Type",
@@ -208,14 +277,15 @@ class EntityGraph:
             This can be an alert, and incident or a DataFrame of alerts or incidents
 
         """
-        inc = None
         if isinstance(incident, pd.DataFrame):
-            for row in incident.iterrows():
-                if "name" in row[1]:
-                    inc = Incident(src_event=row[1])  # type: ignore
-                elif "AlertName" in row[1]:
-                    inc = Alert(src_event=row[1])  # type: ignore
-                self._add_incident_or_alert_node(inc)
+            if "name" in incident.columns:
+                inc_type: type = Incident
+            elif "AlertName" in incident.columns:
+                inc_type = Alert
+            else:
+                return
+            for row in incident.to_dict(orient="records"):
+                self._add_incident_or_alert_node(inc_type(src_event=row))
         else:
             self._add_incident_or_alert_node(incident)
 
@@ -224,6 +294,7 @@ class EntityGraph:
         name: str,
         description: Optional[str] = None,
         attached_to: Union[str, List] = None,
+        timestamp: Optional[datetime] = None,
     ):
         """
         Add a node to the graph representing a note or comment.
@@ -236,22 +307,31 @@ class EntityGraph:
             A description of the note, by default None
         attached_to : Union[str, List], optional
             What existing nodes on the graph to attach it the note to, by default None
+        timestamp : Optional[datetime], optional
+            The time to record for the note, by default the current UTC time
         user: str, optional
             What user to associate the note with
 
+        Raises
+        ------
+        MsticpyUserError
+            If any of the `attached_to` nodes aren't present in the graph
+
         """
+        if isinstance(attached_to, str):
+            attached_to = [attached_to]
+        attached_to = attached_to or []
+        missing = [link for link in attached_to if link not in self.alertentity_graph]
+        if missing:
+            raise MsticpyUserError(title=f"Node(s) {missing} not found in graph")
         self.alertentity_graph.add_node(
             name,
             Name=name,
             Description=description,
             Type="analystnote",
-            TimeGenerated=datetime.now(),
+            TimeGenerated=timestamp or datetime.now(timezone.utc),
         )
-        if attached_to:
-            if isinstance(attached_to, str):
-                attached_to = [attached_to]
-            for link in attached_to:
-                self.add_link(name, link)
+        self.alertentity_graph.add_edges_from((name, link) for link in attached_to)
 
     def add_link(self, source: str, target: str):
         """
@@ -331,20 +411,30 @@ class EntityGraph:
 
     def to_df(self) -> pd.DataFrame:
         """Generate a dataframe of nodes in the graph."""
-        node_list = [
+        names, descriptions, types = [], [], []
+        time_generated, end_times, start_times = [], [], []
+        for node in self.alertentity_graph.nodes.values():
+            names.append(node.get("Name"))
+            descriptions.append(node.get("Description"))
+            types.append(node.get("Type"))
+            time_generated.append(node.get("TimeGenerated"))
+            end_times.append(node.get("EndTime"))
+            start_times.append(node.get("StartTime", node.get("TimeGenerated")))
+        nodes_df = pd.DataFrame(
             {
-                "Name": node.get("Name"),
-                "Description": node.get("Description"),
-                "Type": node.get("Type"),
-                "TimeGenerated": _convert_to_tz_aware_ts(node.get("TimeGenerated")),
-                "EndTime": _convert_to_tz_aware_ts(node.get("EndTime")),
-                "StartTime": _convert_to_tz_aware_ts(
-                    node.get("StartTime", node.get("TimeGenerated"))
-                ),
+                "Name": names,
+                "Description": descriptions,
+                "Type": types,
+                "TimeGenerated": time_generated,
+                "EndTime": end_times,
+                "StartTime": start_times,
             }
-            for node in self.alertentity_graph.nodes.values()
-        ]
-        return pd.DataFrame(node_list).replace("None", np.nan)
+        ).replace("None", np.nan)
+        for time_col in ("TimeGenerated", "EndTime", "StartTime"):
+            nodes_df[time_col] = pd.to_datetime(
+                nodes_df[time_col], utc=True, errors="coerce", **_TO_DATETIME_KWARGS
+            )
+        return nodes_df
 
     def _add_incident_or_alert_node(self, incident: Union[Incident, Alert, None]):
         """Check what type of entity is passed in and creates relevant graph."""
@@ -355,13 +445,13 @@ class EntityGraph:
 
     def _add_entity_node(self, ent, attached_to=None):
         """Add an Entity to the graph."""
-        self.alertentity_graph = nx.compose(self.alertentity_graph, ent.to_networkx())
+        self.alertentity_graph.update(ent.to_networkx())
         if attached_to:
             self.add_link(attached_to, ent.name_str)
 
     def _add_alert_node(self, alert, incident_name=None):
         """Add an alert entity to the graph."""
-        self.alertentity_graph = nx.compose(self.alertentity_graph, alert.to_networkx())
+        self.alertentity_graph.update(alert.to_networkx())
         if alert["Entities"]:
             for ent in alert["Entities"]:
                 self._add_entity_node(ent, alert.name_str)
@@ -370,9 +460,7 @@ class EntityGraph:
 
     def _add_incident_node(self, incident):
         """Add an incident entity to the graph."""
-        self.alertentity_graph = nx.compose(
-            self.alertentity_graph, incident.to_networkx()
-        )
+        self.alertentity_graph.update(incident.to_networkx())
         if incident.Alerts:
             for alert in incident.Alerts:
                 self._add_alert_node(alert, incident.name_str)
@@ -398,26 +486,12 @@ class EntityGraph:
         return self.alertentity_graph
 
 
-def _convert_to_tz_aware_ts(date_string: Optional[str]) -> Optional[datetime]:
-    """Convert a date string to a timezone aware datetime object."""
-    if date_string is None:
-        return None
-    date_time = parser.parse(date_string)
-    if date_time.tzinfo is None:
-        return date_time.replace(tzinfo=timezone.utc)
-    return date_time
-
-
 def _dedupe_entities(alerts, ents) -> list:
     """Deduplicate incident and alert entities."""
-    alert_entities = []
-    for alert in alerts:
-        if alert["Entities"]:
-            alert_entities += [hash(ent) for ent in alert["Entities"]]
-    for ent in ents:
-        if hash(ent) in alert_entities:
-            ents.remove(ent)
-    return ents
+    alert_entities = {
+        hash(ent) for alert in alerts if alert["Entities"] for ent in alert["Entities"]
+    }
+    return [ent for ent in ents if hash(ent) not in alert_entities]
 
 
 @export
@@ -429,6 +503,7 @@ def plot_entitygraph(  # pylint: disable=too-many-locals
     width: int = 800,
     scale: int = 2,
     hide: bool = False,
+    node_positions: Optional[Dict[Any, Any]] = None,
 ) -> figure:
     """
     Plot entity graph with Bokeh.
@@ -451,6 +526,9 @@ def plot_entitygraph(  # pylint: disable=too-many-locals
     hide : bool, optional
         Don't show the plot, by default False. If True, just
         return the figure.
+    node_positions : Optional[Dict[Any, Any]], optional
+        Node (x, y) positions keyed by node name, by default None.
+        If not supplied, positions are calculated using a spring layout.
 
     Returns
     -------
@@ -458,24 +536,8 @@ def plot_entitygraph(  # pylint: disable=too-many-locals
         The network plot.
 
     """
-    color_map = {
-        "incident": "red",
-        "alert": "orange",
-        "alerts": "orange",
-        "securityalert": "orange",
-        "analystnote": "blue",
-    }
-    output_notebook()
+    _ensure_notebook()
     font_pnt = f"{font_size}pt" if isinstance(font_size, int) else font_size
-    node_attrs = {}
-    for node, attrs in entity_graph.nodes(data=True):
-        try:
-            color = color_map.get(attrs["Type"].lower(), "green")
-        except KeyError:
-            color = "green"
-        node_attrs.update({node: color})
-
-    nx.set_node_attributes(entity_graph, node_attrs, "node_color")
 
     plot = figure(
         title="Alert Entity graph",
@@ -495,40 +557,29 @@ def plot_entitygraph(  # pylint: disable=too-many-locals
         )
     )
 
-    entity_graph_for_plotting = nx.Graph()
-    index_node = 0
-    rev_index = {}
-    fwd_index = {}
-    node_attributes = {}
-    for node_key in entity_graph.nodes:
-        entity_graph_for_plotting.add_node(index_node)
-        rev_index[node_key] = index_node
-        fwd_index[index_node] = node_key
-        node_attributes[index_node] = entity_graph.nodes[node_key]
-        index_node += 1
-
-    nx.set_node_attributes(entity_graph_for_plotting, node_attributes)
-
-    for source_node, target_node in entity_graph.edges:
-        entity_graph_for_plotting.add_edge(
-            rev_index[source_node], rev_index[target_node]
-        )
-
-    graph_renderer = from_networkx(
-        entity_graph_for_plotting, nx.spring_layout, scale=scale, center=(0, 0)
+    # Bokeh needs integer node keys - the original key is kept for labels
+    entity_graph_for_plotting = nx.convert_node_labels_to_integers(
+        entity_graph, label_attribute="_orig_label"
     )
-    if _BOKEH_VERSION > Version("3.2.0"):
-        circle_parms = {
-            "radius": node_size // 2,
-            "fill_color": "node_color",
-            "fill_alpha": 0.5,
+    fwd_index = nx.get_node_attributes(entity_graph_for_plotting, "_orig_label")
+    node_colors = {
+        node: _TYPE_COLOR_MAP.get(str(attrs.get("Type", "")).lower(), _DEFAULT_COLOR)
+        for node, attrs in entity_graph_for_plotting.nodes(data=True)
+    }
+    nx.set_node_attributes(entity_graph_for_plotting, node_colors, "node_color")
+
+    if node_positions:
+        layout = {
+            index: node_positions[node_key] for index, node_key in fwd_index.items()
         }
     else:
-        circle_parms = {
-            "size": node_size,
-            "fill_color": "node_color",
-            "fill_alpha": 0.5,
-        }
+        layout = nx.spring_layout(entity_graph_for_plotting, scale=scale, center=(0, 0))
+    graph_renderer = from_networkx(entity_graph_for_plotting, layout)
+    circle_parms = {
+        _CIRCLE_KEY: node_size // 2 if _BOKEH_GT_3_2 else node_size,
+        "fill_color": "node_color",
+        "fill_alpha": 0.5,
+    }
     graph_renderer.node_renderer.glyph = Circle(**circle_parms)  # type: ignore[attr-defined]
 
     # pylint: disable=no-member
@@ -536,16 +587,32 @@ def plot_entitygraph(  # pylint: disable=too-many-locals
 
     # Create labels
     label_layout = graph_renderer.layout_provider.graph_layout  # type: ignore[attr-defined]
-    for index, pos in label_layout.items():
-        label = Label(
-            x=pos[0],
-            y=pos[1],
+    label_source = ColumnDataSource(
+        {
+            "x": np.fromiter(
+                (pos[0] for pos in label_layout.values()),
+                dtype=np.float64,
+                count=len(label_layout),
+            ),
+            "y": np.fromiter(
+                (pos[1] for pos in label_layout.values()),
+                dtype=np.float64,
+                count=len(label_layout),
+            ),
+            "text": [fwd_index[int(index)] for index in label_layout],
+        }
+    )
+    plot.add_layout(
+        LabelSet(
+            x="x",
+            y="y",
             x_offset=5,
             y_offset=5,
-            text=fwd_index[int(index)],
+            text="text",
             text_font_size=font_pnt,
+            source=label_source,
         )
-        plot.add_layout(label)
+    )
     # pylint: enable=no-member
     if not hide:
         show(plot)
@@ -4,6 +4,7 @@
 # license information.
 # --------------------------------------------------------------------------
 """TIProviders test class."""
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple, Union
@@ -272,3 +273,30 @@ def test_sentinel_ti_multi_lookups(
     if details:
         check.equal(results.iloc[0]["Details"], details)
     check.equal(results.iloc[0]["Status"], status)
+
+
+def test_sentinel_ti_async_bulk_lookups(query_provider, monkeypatch):
+    """Test async lookups issue one query per IoC type."""
+    test_config1 = Path(_TEST_DATA).joinpath("msticpyconfig-askql.yaml").resolve()
+    with custom_mp_config(test_config1):
+        as_byoti_prov = AzSTI(query_provider=query_provider)
+    bulk_calls = []
+    in_flight = []
+    orig_lookup_iocs = as_byoti_prov.lookup_iocs
+
+    def _lookup_iocs(data, *args, **kwargs):
+        # the shared query provider must not run queries concurrently
+        check.equal(in_flight, [])
+        in_flight.append(True)
+        bulk_calls.append(data)
+        try:
+            return orig_lookup_iocs(data, *args, **kwargs)
+        finally:
+            in_flight.pop()
+
+    monkeypatch.setattr(as_byoti_prov, "lookup_iocs", _lookup_iocs)
+    results = asyncio.run(as_byoti_prov.lookup_iocs_async(_IOC_IPS + _IOC_URLS))
+
+    check.equal(len(bulk_calls), 2)
+    check.equal(len(results), len(_IOC_IPS) + len(_IOC_URLS))
+    check.equal(set(results["IocType"]), {"ipv4", "url"})
@@ -4,10 +4,13 @@
 # license information.
 # --------------------------------------------------------------------------
 """TIProviders test class."""
+import asyncio
 import datetime as dt
 import json
 import random
 import string
+import threading
+import time
 import warnings
 from dataclasses import dataclass
 from pathlib import Path
@@ -18,12 +21,18 @@ import pytest
 import pytest_check as check
 
 from msticpy.common import pkg_config
-from msticpy.common.provider_settings import get_provider_settings
+from msticpy.common.exceptions import MsticpyUserConfigError
+from msticpy.common.provider_settings import ProviderSettings, get_provider_settings
+from msticpy.context.lookup import ProgressCounter
+from msticpy.context.lookup_result import LookupStatus
 from msticpy.context.preprocess_observable import _clean_url, preprocess_observable
-from msticpy.context.provider_base import generate_items
+from msticpy.context.provider_base import Provider, generate_items
 from msticpy.context.tilookup import TILookup
+from msticpy.context.tiproviders import ti_http_provider, ti_provider_base
 from msticpy.context.tiproviders.result_severity import ResultSeverity
+from msticpy.context.tiproviders.ti_provider_base import TIProvider
 from msticpy.context.tiproviders.tor_exit_nodes import Tor
+from msticpy.context.tiproviders.virustotal import VirusTotal
 
 from ..unit_test_lib import custom_mp_config, get_test_data_path
 
@@ -589,6 +598,384 @@ def test_iterable_generator():
     #     os.environ[pkg_config._CONFIG_ENV_VAR] = saved_env
 
 
+def test_resolve_ioc_types():
+    """Test batch IoC type resolution."""
+    observables = [_IOC_IPS[0], "www.microsoft.com", _IOC_IPS[0], "not an ioc"]
+    ioc_types = TIProvider.resolve_ioc_types(observables)
+    check.equal(ioc_types, [TIProvider.resolve_ioc_type(obs) for obs in observables])
+    check.equal(ioc_types[:3], ["ipv4", "dns", "ipv4"])
+
+
+class _SlowTIProvider(TIProvider):
+    """Test provider that records the number of concurrent lookups."""
+
+    _QUERIES = {"ipv4": None}
+    _CONCURRENCY = 4
+
+    def __init__(self):
+        """Initialize the provider."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lookups = 0
+
+    def parse_results(self, response):
+        """Return the details of the response."""
+        return True, ResultSeverity.information, {}
+
+    def lookup_ioc(self, ioc, ioc_type=None, query_type=None):
+        """Lookup a single IoC (slowly)."""
+        with self._lock:
+            self.lookups += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        if ioc == _IOC_IPS[0]:
+            raise ConnectionError("Test failure")
+        result = self._check_ioc_type(ioc, ioc_type, query_type)
+        return pd.DataFrame([result])
+
+
+def test_lookup_iocs_async_concurrent():
+    """Test async IoC lookups run concurrently within the limit."""
+    provider = _SlowTIProvider()
+    results_df = asyncio.run(provider.lookup_iocs_async(_IOC_IPS))
+
+    check.equal(len(results_df), len(_IOC_IPS))
+    check.greater(provider.max_in_flight, 1)
+    check.less_equal(provider.max_in_flight, _SlowTIProvider._CONCURRENCY)
+    failed = results_df[results_df["Ioc"] == _IOC_IPS[0]].iloc[0]
+    check.equal(failed["Status"], LookupStatus.QUERY_FAILED.value)
+    check.is_in("ConnectionError", failed["Details"])
+
+
+def test_lookup_iocs_input_order():
+    """Test lookup results are returned in the order of the input IoCs."""
+    provider = _SlowTIProvider()
+    iocs = [_IOC_IPS[1], "www.microsoft.com", _IOC_IPS[2], "bing.com", _IOC_IPS[1]]
+    results_df = asyncio.run(provider.lookup_iocs_async(iocs))
+    check.equal(results_df["Ioc"].to_list(), iocs)
+    results_df = provider.lookup_iocs(iocs)
+    check.equal(results_df["Ioc"].to_list(), iocs)
+
+
+def test_set_lookup_limits():
+    """Test overriding provider lookup limits."""
+    provider = _SlowTIProvider()
+    provider.set_lookup_limits(concurrency="2", requests_per_minute="30")
+    check.equal(provider._lookup_limits(), (2, 30))
+    check.equal(_SlowTIProvider()._lookup_limits(), (4, None))
+    provider.set_lookup_limits(requests_per_minute=0)
+    check.equal(provider._lookup_limits(), (2, None))
+    with pytest.raises(ValueError):
+        provider.set_lookup_limits(concurrency=0)
+    check.is_none(VirusTotal._REQUESTS_PER_MINUTE)
+
+
+def test_lookup_limits_shared_across_calls(monkeypatch):
+    """Test the rate limit applies across separate lookup calls."""
+    delays = []
+
+    async def _sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(ti_provider_base.asyncio, "sleep", _sleep)
+    provider = _SlowTIProvider()
+    provider.set_lookup_limits(requests_per_minute=2)
+
+    provider.lookup_iocs(_IOC_IPS[1:3])
+    check.equal(delays, [])
+    provider.lookup_iocs(_IOC_IPS[3:5])
+    check.equal(len(delays), 2)
+    check.greater(min(delays), 25)
+    asyncio.run(provider.lookup_iocs_async(_IOC_IPS[5:6]))
+    check.equal(len(delays), 3)
+    check.greater(delays[-1], 85)
+
+
+def test_lookup_items_use_lookup_limits(monkeypatch):
+    """Test the TILookup provider entry points apply the rate limit."""
+    delays = []
+
+    async def _sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(ti_provider_base.asyncio, "sleep", _sleep)
+    provider = _SlowTIProvider()
+    provider.set_lookup_limits(requests_per_minute=2)
+    iocs = _IOC_IPS[1:6]
+    prog_counter = ProgressCounter(total=len(iocs))
+
+    results_df = asyncio.run(
+        provider.lookup_items_async(iocs, prog_counter=prog_counter)
+    )
+    check.equal(results_df["Ioc"].to_list(), iocs)
+    check.equal(len(delays), 3)
+    check.equal(asyncio.run(prog_counter.get_remaining()), 0)
+
+    results_df = provider.lookup_items(_IOC_IPS[6:8])
+    check.equal(len(results_df), 2)
+    check.equal(len(delays), 5)
+
+
+def test_lookup_items_async_progress():
+    """Test the progress counter is decremented as each IoC completes."""
+    provider = _SlowTIProvider()
+    iocs = [*_IOC_IPS[:4], _IOC_IPS[1]]
+    prog_counter = ProgressCounter(total=len(iocs))
+    decrements = []
+    decrement = prog_counter.decrement
+
+    async def _decrement(increment=1):
+        decrements.append(increment)
+        await decrement(increment)
+
+    prog_counter.decrement = _decrement
+    results_df = asyncio.run(
+        provider.lookup_items_async(iocs, prog_counter=prog_counter, item_type="ipv4")
+    )
+    check.equal(results_df["Ioc"].to_list(), iocs)
+    check.equal(sorted(decrements), [1, 1, 1, 1, 1])
+    check.equal(asyncio.run(prog_counter.get_remaining()), 0)
+
+
+def test_lookup_limits_from_settings(ti_lookup):
+    """Test TILookup applies lookup limits from provider settings."""
+    provider = _SlowTIProvider()
+    settings = ProviderSettings(
+        name="SlowTI",
+        description="test",
+        args={"Concurrency": "2", "RequestsPerMinute": "30"},
+    )
+    ti_lookup._configure_provider(provider, "SlowTI", settings)
+    check.equal(provider._lookup_limits(), (2, 30))
+
+    settings.args["Concurrency"] = "0"
+    with pytest.raises(MsticpyUserConfigError):
+        ti_lookup._configure_provider(provider, "SlowTI", settings)
+
+
+class _RateLimitedSession:
+    """Mock httpx session returning queued responses."""
+
+    def __init__(self, responses):
+        """Initialize the session."""
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, *args, **kwargs):
+        """Return the next response."""
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def test_http_ti_rate_limit_retry(ti_lookup, monkeypatch):
+    """Test HTTP TI lookups retry rate-limited requests."""
+    delays = []
+    monkeypatch.setattr(ti_http_provider.time, "sleep", delays.append)
+    provider = ti_lookup.loaded_providers["OTX"]
+
+    monkeypatch.setattr(
+        provider,
+        "_httpx_client",
+        _RateLimitedSession(
+            [httpx.Response(429, headers={"Retry-After": "5"}), httpx.Response(404)]
+        ),
+    )
+    result = provider.lookup_ioc(_IOC_IPS[1], "ipv4")
+    check.equal(provider._httpx_client.calls, 2)
+    check.equal(delays, [5])
+    check.equal(result.iloc[0]["Status"], 404)
+
+    delays.clear()
+    monkeypatch.setattr(
+        provider,
+        "_httpx_client",
+        _RateLimitedSession([httpx.Response(429)] * (provider._MAX_RETRIES + 1)),
+    )
+    result = provider.lookup_ioc(_IOC_IPS[1], "ipv4")
+    check.equal(provider._httpx_client.calls, provider._MAX_RETRIES + 1)
+    check.equal(delays, [1, 2, 4])
+    check.equal(result.iloc[0]["Status"], 429)
+
+
+def test_lookup_item_cache():
+    """Test repeated lookups are served from the provider cache."""
+    provider = _SlowTIProvider()
+    first = provider.lookup_item(_IOC_IPS[1], "ipv4")
+    second = provider.lookup_item(_IOC_IPS[1], "ipv4")
+
+    check.is_(first, second)
+    cache_info = provider.cache_info()
+    check.equal(cache_info.hits, 1)
+    check.equal(cache_info.misses, 1)
+    check.equal(cache_info.currsize, 1)
+
+    asyncio.run(provider.lookup_iocs_async({_IOC_IPS[1]: "ipv4"}))
+    check.equal(provider.cache_info().hits, 2)
+
+    provider.cache_clear()
+    check.equal(provider.cache_info().currsize, 0)
+
+    # failed lookups are not cached
+    failed = provider.lookup_item("not-an-ip", "ipv4")
+    check.not_equal(failed.iloc[0]["Status"], LookupStatus.OK.value)
+    provider.lookup_item("not-an-ip", "ipv4")
+    check.equal(provider.cache_info().currsize, 0)
+    check.equal(provider.cache_info().misses, 2)
+
+
+def test_lookup_cache_shared_by_sync_and_async():
+    """Test untyped single and bulk lookups share cache entries."""
+    provider = _SlowTIProvider()
+    provider.lookup_item(_IOC_IPS[1])
+    results_df = provider.lookup_iocs([_IOC_IPS[1]])
+
+    check.equal(results_df.iloc[0]["Status"], LookupStatus.OK.value)
+    check.equal(provider.lookups, 1)
+    cache_info = provider.cache_info()
+    check.equal(cache_info.hits, 1)
+    check.equal(cache_info.currsize, 1)
+
+
+def test_lookup_iocs_duplicates_looked_up_once():
+    """Test repeated IoCs in a batch are only looked up once."""
+    provider = _SlowTIProvider()
+    iocs = [_IOC_IPS[1], "www.microsoft.com", _IOC_IPS[2], "www.microsoft.com"]
+    iocs.append(_IOC_IPS[1])
+    results_df = provider.lookup_iocs(iocs)
+
+    check.equal(results_df["Ioc"].to_list(), iocs)
+    check.equal(provider.lookups, 3)
+    check.equal(provider.cache_info().misses, 3)
+
+    results_df = asyncio.run(provider.lookup_iocs_async([_IOC_IPS[0]] * 3))
+    check.equal(provider.lookups, 4)
+    check.equal(len(results_df), 3)
+    check.is_true((results_df["Status"] == LookupStatus.QUERY_FAILED.value).all())
+
+
+def test_lookup_iocs_sync_concurrent():
+    """Test sync IoC lookups use the concurrent async engine."""
+    provider = _SlowTIProvider()
+    results_df = provider.lookup_iocs(_IOC_IPS)
+
+    check.equal(len(results_df), len(_IOC_IPS))
+    check.greater(provider.max_in_flight, 1)
+    failed = results_df[results_df["Ioc"] == _IOC_IPS[0]].iloc[0]
+    check.equal(failed["Status"], LookupStatus.QUERY_FAILED.value)
+
+    async def _lookup_in_loop():
+        return provider.lookup_iocs(_IOC_IPS[1:])
+
+    check.equal(len(asyncio.run(_lookup_in_loop())), len(_IOC_IPS) - 1)
+
+
+def test_iter_lookup_iocs():
+    """Test IoC lookup results are returned in chunks."""
+    provider = _SlowTIProvider()
+    iocs = _IOC_IPS[1:]
+    chunks = list(provider.iter_lookup_iocs(iocs, chunk_size=2))
+
+    check.equal(len(chunks), (len(iocs) + 1) // 2)
+    check.is_true(all(len(chunk) <= 2 for chunk in chunks))
+    results_df = provider.lookup_iocs(iocs)
+    check.equal(results_df["Ioc"].to_list(), iocs)
+    check.is_true(provider.lookup_iocs([]).empty)
+    with pytest.raises(ValueError):
+        next(provider.iter_lookup_iocs(iocs, chunk_size=0))
+
+
+def test_iter_lookup_iocs_resolves_types_once(monkeypatch):
+    """Test IoC types are resolved once per distinct observable in a chunk."""
+    resolved = []
+    resolve_item_type = Provider.resolve_item_type
+
+    def _resolve_item_type(item):
+        resolved.append(item)
+        return resolve_item_type(item)
+
+    monkeypatch.setattr(Provider, "resolve_item_type", staticmethod(_resolve_item_type))
+    provider = _SlowTIProvider()
+    iocs = [_IOC_IPS[1], _IOC_IPS[2]] * 3
+    chunks = list(provider.iter_lookup_iocs(iocs, chunk_size=len(iocs)))
+    check.equal(sorted(resolved), sorted(iocs[:2]))
+    check.equal(chunks[0]["Ioc"].to_list(), iocs)
+    check.equal(set(chunks[0]["IocType"]), {"ipv4"})
+
+
+class _BulkTIProvider(_SlowTIProvider):
+    """Test provider that looks up multiple IoCs in one query."""
+
+    _SUPPORTS_BULK_LOOKUP = True
+
+    def __init__(self):
+        """Initialize the provider."""
+        super().__init__()
+        self.bulk_lookups = []
+
+    def lookup_iocs(self, data, ioc_col=None, ioc_type_col=None, query_type=None):
+        """Lookup a collection of IoCs in a single query."""
+        self.bulk_lookups.append(data[ioc_col].to_list())
+        return pd.DataFrame(
+            [self._check_ioc_type(ioc, "ipv4", query_type) for ioc in data[ioc_col]]
+        )
+
+
+def test_iter_lookup_iocs_bulk_provider():
+    """Test chunks are passed to providers that override lookup_iocs."""
+    provider = _BulkTIProvider()
+    iocs = _IOC_IPS[1:]
+    chunks = list(provider.iter_lookup_iocs(iocs, chunk_size=2))
+
+    check.equal(
+        provider.bulk_lookups, [iocs[idx : idx + 2] for idx in range(0, len(iocs), 2)]
+    )
+    check.equal(provider.lookups, 0)
+    check.equal(pd.concat(chunks)["Ioc"].to_list(), iocs)
+
+
+def test_lookup_items_bulk_provider_limited(monkeypatch):
+    """Test lookup_items uses the rate limited engine for bulk providers."""
+    delays = []
+
+    async def _sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(ti_provider_base.asyncio, "sleep", _sleep)
+    provider = _BulkTIProvider()
+    provider.set_lookup_limits(requests_per_minute=1)
+    results_df = provider.lookup_items(_IOC_IPS[1:4])
+
+    check.equal(results_df["Ioc"].to_list(), _IOC_IPS[1:4])
+    check.equal(provider.bulk_lookups, [])
+    check.equal(len(delays), 2)
+
+
+class _ExtendedTIProvider(_SlowTIProvider):
+    """Test provider extending the base class lookup_iocs."""
+
+    def lookup_iocs(self, data, ioc_col=None, ioc_type_col=None, query_type=None):
+        """Lookup a collection of IoCs, adding a column to the results."""
+        results = super().lookup_iocs(data, ioc_col, ioc_type_col, query_type)
+        results["Extended"] = True
+        return results
+
+
+def test_lookup_iocs_super_call():
+    """Test an overridden lookup_iocs can call the base class lookup_iocs."""
+    provider = _ExtendedTIProvider()
+    iocs = _IOC_IPS[1:4]
+    results_df = provider.lookup_iocs(iocs)
+
+    check.equal(results_df["Ioc"].to_list(), iocs)
+    check.is_true(results_df["Extended"].all())
+    check.equal(provider.lookups, len(iocs))
+
+
 # -------------- PROVIDER RESPONSES ------------------
 
 
@@ -179,6 +179,15 @@ def test_alert_entity_creation():
     assert len(alert_entity.properties) == 15
     assert alert_entity.SystemAlertIds == "f1ce87ca-8863-4a66-a0bd-a4d3776a7c64"
 
+    # create from a dict of the event
+    dict_alert_entity = Alert(src_event=alert_df.iloc[0].to_dict())
+    assert dict_alert_entity.properties.keys() == alert_entity.properties.keys()
+    assert len(dict_alert_entity.Entities) == len(alert_entity.Entities)
+    # event without entities
+    partial_alert_entity = Alert(src_event={"AlertDisplayName": "test"})
+    assert partial_alert_entity.AlertDisplayName == "test"
+    assert not partial_alert_entity.Entities
+
 
 @pytest.mark.filterwarnings("ignore::UserWarning")
 def test_sentinel_entity_creation():
@@ -189,3 +198,11 @@ def test_sentinel_entity_creation():
     assert len(sent_alert_entity.properties) == 29
     assert "Search Query Results Overall Count" in sent_alert_entity.analytic
     assert sent_alert_entity.is_in_log_analytics
+
+    # create from a dict of the event
+    dict_sent_alert_entity = SentinelAlert(src_event=sent_alert_df.iloc[0].to_dict())
+    assert (
+        dict_sent_alert_entity.properties.keys() == sent_alert_entity.properties.keys()
+    )
+    assert "Search Query Results Overall Count" in dict_sent_alert_entity.analytic
+    assert dict_sent_alert_entity.is_in_log_analytics
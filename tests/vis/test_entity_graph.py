@@ -4,7 +4,11 @@
 # license information.
 # --------------------------------------------------------------------------
 """Test module for EntityGraph."""
+from types import SimpleNamespace
+
 import pandas as pd
+import pytest
+from bokeh.models import LabelSet
 from bokeh.models.layouts import Column
 
 try:
@@ -14,11 +18,13 @@ except ImportError:
 
     Figure = LayoutDOM
 
+from msticpy.common.exceptions import MsticpyUserError
 from msticpy.datamodel.entities import Alert, Entity, Incident
 
 # pylint: disable=unused-import
 from msticpy.vis import mp_pandas_plot  # noqa: F401
-from msticpy.vis.entity_graph_tools import EntityGraph
+from msticpy.vis import entity_graph_tools
+from msticpy.vis.entity_graph_tools import EntityGraph, _dedupe_entities
 
 from ..nbtools.test_security_alert import sample_alert
 from ..unit_test_lib import get_test_data_path
@@ -162,6 +168,17 @@ def test_note_add():
     assert len(graph.alertentity_graph.nodes()) == 5
     assert "Test Note" in graph.alertentity_graph.nodes()
     assert graph.alertentity_graph.has_edge("Test Note", "demo")
+    graph.add_note("Multi Note", attached_to=["demo", "CONTOSO\\auser"])
+    assert graph.alertentity_graph.has_edge("Multi Note", "demo")
+    assert graph.alertentity_graph.has_edge("Multi Note", "CONTOSO\\auser")
+    with pytest.raises(MsticpyUserError):
+        graph.add_note("Bad Note", attached_to=["demo", "missing"])
+    assert "Bad Note" not in graph.alertentity_graph.nodes()
+    note_time = graph.alertentity_graph.nodes["Test Note"]["TimeGenerated"]
+    assert note_time.tzinfo is not None
+    note_ts = pd.Timestamp("2024-01-01T00:00:00Z")
+    graph.add_note("Timed Note", timestamp=note_ts)
+    assert graph.alertentity_graph.nodes["Timed Note"]["TimeGenerated"] == note_ts
 
 
 def test_link_add_remove():
@@ -193,6 +210,19 @@ def test_to_df():
     assert (
         "Alert: User Added to Privileged Group in CONTOSO Domain" in df["Name"].values
     )
+    for time_col in ("TimeGenerated", "EndTime", "StartTime"):
+        assert isinstance(df[time_col].dtype, pd.DatetimeTZDtype)
+        assert str(df[time_col].dt.tz) == "UTC"
+    inc_row = df[df["Type"] == "incident"].iloc[0]
+    assert inc_row["EndTime"] == pd.Timestamp("2021-09-22T14:39:24.04Z")
+
+
+def test_dedupe_entities():
+    """Test incident entities also attached to alerts are removed."""
+    alerts = [{"Entities": ["host1", "account1"]}, {"Entities": None}]
+    ents = ["host1", "account1", "url1"]
+    assert _dedupe_entities(alerts, ents) == ["url1"]
+    assert ents == ["host1", "account1", "url1"]
 
 
 def test_plot():
@@ -202,6 +232,67 @@ def test_plot():
     tl_plot = graph.plot(hide=True, timeline=True)
     assert isinstance(plot, Figure)
     assert isinstance(tl_plot, Column)
+    label_sets = [item for item in plot.center if isinstance(item, LabelSet)]
+    assert len(label_sets) == 1
+    assert sorted(label_sets[0].source.data["text"]) == sorted(
+        graph.alertentity_graph.nodes()
+    )
+
+
+def test_notebook_initialized_once(monkeypatch):
+    """Test BokehJS is only loaded into the notebook when output is not enabled."""
+    calls = []
+    bokeh_state = SimpleNamespace(notebook=False)
+
+    def _output_notebook():
+        calls.append(True)
+        bokeh_state.notebook = True
+
+    monkeypatch.setattr(entity_graph_tools, "curstate", lambda: bokeh_state)
+    monkeypatch.setattr(entity_graph_tools, "output_notebook", _output_notebook)
+    graph = EntityGraph(incident)
+    graph.plot(hide=True)
+    EntityGraph(incident)
+    assert len(calls) == 1
+    # notebook output is re-enabled after it is reset
+    bokeh_state.notebook = False
+    graph.plot(hide=True)
+    assert len(calls) == 2
+
+
+def test_plot_layout_cached():
+    """Test node layout is reused until the graph changes."""
+    graph = EntityGraph(incident)
+    graph.plot(hide=True)
+    layout = graph._get_layout()
+    graph.plot(hide=True, timeline=True)
+    assert graph._get_layout() is layout
+    graph.add_entity(entity, attached_to="demo")
+    new_layout = graph._get_layout()
+    assert new_layout is not layout
+    assert "https://www.contoso.com" in new_layout
+
+
+def test_plot_node_positions():
+    """Test node positions passed to plot are used instead of the layout."""
+    graph = EntityGraph(incident)
+    node_positions = {
+        node: (float(idx), 0.0) for idx, node in enumerate(graph.alertentity_graph)
+    }
+    plot = graph.plot(hide=True, node_positions=node_positions)
+    graph_renderer = plot.renderers[0]
+    assert sorted(graph_renderer.layout_provider.graph_layout.values()) == sorted(
+        node_positions.values()
+    )
+
+
+def test_plot_timeline_no_timestamps(capsys):
+    """Test timeline plot falls back to graph when there are no timestamps."""
+    graph = EntityGraph(entity)
+    graph.alertentity_graph.nodes["https://www.contoso.com"]["TimeGenerated"] = None
+    plot = graph.plot(hide=True, timeline=True)
+    assert isinstance(plot, Figure)
+    assert "No timestamps available" in capsys.readouterr().out
 
 
 def test_df_plot():